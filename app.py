@@ -4,33 +4,66 @@
 import os
 import sys
 import json
-import re
+import mmap
+import atexit
 import time
 import queue
 import threading
+import hashlib
 import subprocess
-from typing import Any, Dict, Optional, Tuple, List
+import selectors
+import importlib.util
+import importlib.metadata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, List
+
+if sys.platform != "win32":
+    import fcntl  # pipe sizing for the MCP server's stdout
 
 import streamlit as st
-from dotenv import load_dotenv
+
+# Optional OpenAI-compatible client (Perplexity works via base_url).
+# It drags in httpx/pydantic, so it is imported on first AI use, not at startup.
+OpenAI = None
+
+
+def _get_openai():
+    """Return the OpenAI client class, importing it lazily; None if unavailable."""
+    global OpenAI
+    if OpenAI is None:
+        try:
+            from openai import OpenAI as _OpenAI
+        except Exception:
+            return None
+        OpenAI = _OpenAI
+    return OpenAI
+
+# Optional C-accelerated JSON for the RPC wire, queue reads and payload export; stdlib fallback
 try:
-    import streamlit as st
-    secrets = st.secrets
+    import orjson
+
+    _dumpb = orjson.dumps
+    _loads = orjson.loads
+
+    def _dumpb_pretty(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
 except ImportError:
-    secrets = {}
+    def _dumpb(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
 
+    def _dumpb_pretty(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode("utf-8")
 
-QUEUE_PATH = (
-    os.getenv("QUEUE_FILE")
-    or secrets.get("QUEUE_FILE")
-    or os.path.join(os.getcwd(), "bridge_queue.jsonl")
-)
+    _loads = json.loads
 
-# Optional OpenAI-compatible client (Perplexity works via base_url)
+# Optional file watcher for the bridge queue; falls back to stat() checks
 try:
-    from openai import OpenAI
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    _WATCHDOG_OK = True
 except Exception:
-    OpenAI = None
+    _WATCHDOG_OK = False
 
 # ---------------------------------------------------------------------
 # MUST BE FIRST: Page Configuration
@@ -45,417 +78,112 @@ st.set_page_config(
 # ---------------------------------------------------------------------
 # ENV Variables
 # ---------------------------------------------------------------------
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY") or st.secrets.get("OPENAI_API_KEY")
-PPLX_API_KEY = os.getenv("PPLX_API_KEY") or st.secrets.get("PPLX_API_KEY")
-QUEUE_FILE = os.getenv("QUEUE_FILE") or os.path.join(os.getcwd(), "bridge_queue.jsonl")
+@st.cache_resource(show_spinner=False)
+def _load_env() -> bool:
+    """Load .env once per process instead of re-reading it on every rerun."""
+    from dotenv import load_dotenv
+    return load_dotenv()
 
-RE_PROGRESS = re.compile(r"Processing\s+(message|file)\s+(\d+)\s*/\s*(\d+)", re.I)
+_load_env()
+
+@st.cache_resource(show_spinner=False)
+def _get_setting(name: str) -> Optional[str]:
+    """Environment first, then st.secrets (a missing secrets.toml is not an error).
+
+    Resolved once per process like the .env load above, so reruns don't go
+    looking for secrets files that aren't there.
+    """
+    val = os.getenv(name)
+    if val:
+        return val
+    try:
+        return st.secrets.get(name)
+    except Exception:
+        return None
+
+OPENAI_API_KEY = _get_setting("OPENAI_API_KEY")
+PPLX_API_KEY = _get_setting("PPLX_API_KEY")
+QUEUE_FILE = _get_setting("QUEUE_FILE") or os.path.join(os.getcwd(), "bridge_queue.jsonl")
+
+# select() only works on sockets on Windows, so fall back to reader threads there
+_USE_SELECTORS = sys.platform != "win32"
+# Linux lets us grow the server's stdout pipe (default 64 KiB) so a large
+# JSON-RPC reply doesn't block the server on a full pipe between our reads
+_STDOUT_PIPE_SZ = 1 << 20
+_READ_SIZE = {"out": _STDOUT_PIPE_SZ, "err": 65536}
+
+_PROGRESS_KINDS = ("message", "file")
+# ASCII-only classes, as re.ASCII would give \s and \d: str.isspace()/isdecimal()
+# also accept Unicode spaces and digits, which int() would then happily parse
+_ASCII_SPACE = " \t\n\r\f\v"
+_ASCII_DIGITS = "0123456789"
 REQUIRED_PIP_PKGS = [
     "mcp",
     "google-api-python-client",
     "google-auth-httplib2",
     "google-auth-oauthlib",
 ]
+# Import names the MCP server needs; a tuple so the cached module check hashes it cheaply
+REQUIRED_IMPORTS = (
+    "mcp",
+    "googleapiclient.discovery",
+    "google_auth_oauthlib.flow",
+)
+
+# UI copy and prompts
+GMAIL_TOOL_INFO = {
+    "check_gmail_privacy": "Scans Gmail for PII exposure, risky headers, and suspicious senders",
+    "get_privacy_summary": "Comprehensive audit of both Gmail and Google Drive",
+    "check_drive_privacy": "Analyzes Drive files for permission issues and public sharing"
+}
+WEBSITE_MODE_INFO = {
+    "generic": "General website scan for cookies, trackers, and privacy policies",
+    "login": "Focused analysis on login forms and authentication security",
+    "signup": "Registration form analysis for PII collection and data minimization"
+}
+PPLX_MODEL = "sonar"
+WEBSITE_SYSTEM_PROMPT = (
+    "You are a privacy/compliance auditor. Simplify the content so everyone understands it, "
+    "even people who aren't well-versed with security and privacy schemes. "
+    "Read the website audit JSON (dynamic or static) and produce a clear summary with:\n"
+    "1) Consent & Cookies — were third-party/ads cookies set pre-consent? Summarize consent/cookies and diffs.\n"
+    "2) Trackers/Third Parties — list notable thirdParty domains.\n"
+    "3) Forms & PII — summarize forms, PII types requested, and minimization concerns by mode (login/signup).\n"
+    "4) Security Headers — note HSTS/CSP/XFO presence and obvious misconfigurations.\n"
+    "5) Policies — whether canonical privacy/terms were fetched; highlight missing rights/retention/transfer mentions.\n"
+    "6) Final Verdict — severity (low/medium/high) with prioritized actions.\n"
+    "Be concise, factual, and action-oriented. If evidence is weak or inconclusive, say so."
+)
 
 # ---------------------------------------------------------------------
 # CUSTOM CSS - HACKATHON-READY CYBERSECURITY THEME
 # ---------------------------------------------------------------------
+# The stylesheet lives in static/theme.css. With server.enableStaticServing on
+# (see .streamlit/config.toml) each run only sends a <link> and the browser
+# caches the file; otherwise it is inlined as a style block.
+THEME_CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "theme.css")
+
+@st.cache_resource(show_spinner=False)
+def _theme_css(path: str, mtime: float) -> Tuple[str, str]:
+    """Read the stylesheet and its content hash; keyed on mtime so edits invalidate it."""
+    with open(path, "r", encoding="utf-8") as f:
+        css = f.read()
+    return css, hashlib.blake2b(css.encode("utf-8"), digest_size=8).hexdigest()
+
 def apply_custom_css():
-    st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;700&family=JetBrains+Mono&display=swap');
-    
-    /* Global theme */
-    :root {
-        --neon-green: #00ff9d;
-        --cyber-blue: #00d4ff;
-        --danger-red: #ff3864;
-        --warning-amber: #ffa500;
-        --bg-primary: #0a0e27;
-        --bg-secondary: #141b3d;
-        --bg-tertiary: #1a2341;
-        --text-primary: #e0e6f0;
-        --text-muted: #8b95b0;
-        --glow-green: rgba(0, 255, 157, 0.4);
-        --glow-blue: rgba(0, 212, 255, 0.4);
-    }
-    
-    * {
-        font-family: 'Inter', sans-serif;
-    }
-    
-    code, pre {
-        font-family: 'JetBrains Mono', monospace !important;
-    }
-    
-    /* Main app background */
-    .stApp {
-        background: linear-gradient(135deg, #0a0e27 0%, #1a1f3a 50%, #0a0e27 100%);
-        background-attachment: fixed;
-    }
-    
-    /* Hide default menu */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    
-    /* Hero section styling */
-    .hero-container {
-        background: linear-gradient(135deg, rgba(0, 255, 157, 0.1) 0%, rgba(0, 212, 255, 0.1) 100%);
-        border: 2px solid var(--neon-green);
-        border-radius: 20px;
-        padding: 2rem;
-        margin: 2rem 0;
-        box-shadow: 0 0 30px var(--glow-green);
-        animation: borderPulse 3s ease-in-out infinite;
-    }
-    
-    @keyframes borderPulse {
-        0%, 100% { box-shadow: 0 0 30px var(--glow-green); }
-        50% { box-shadow: 0 0 50px var(--glow-green); }
-    }
-    
-    .hero-title {
-        font-size: 3rem;
-        font-weight: 700;
-        background: linear-gradient(135deg, var(--neon-green) 0%, var(--cyber-blue) 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        text-align: center;
-        margin-bottom: 1rem;
-        letter-spacing: 2px;
-    }
-    
-    .hero-subtitle {
-        text-align: center;
-        color: var(--text-muted);
-        font-size: 1.2rem;
-        margin-bottom: 1.5rem;
-    }
-    
-    /* Feature cards */
-    .feature-card {
-        background: linear-gradient(135deg, var(--bg-secondary) 0%, var(--bg-tertiary) 100%);
-        border: 2px solid transparent;
-        border-radius: 15px;
-        padding: 2rem;
-        margin: 1rem 0;
-        transition: all 0.3s ease;
-        cursor: pointer;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .feature-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        border-radius: 15px;
-        padding: 2px;
-        background: linear-gradient(135deg, var(--neon-green), var(--cyber-blue));
-        -webkit-mask: linear-gradient(#fff 0 0) content-box, linear-gradient(#fff 0 0);
-        -webkit-mask-composite: xor;
-        mask-composite: exclude;
-        opacity: 0;
-        transition: opacity 0.3s ease;
-    }
-    
-    .feature-card:hover::before {
-        opacity: 1;
-    }
-    
-    .feature-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 10px 40px var(--glow-green);
-    }
-    
-    .feature-icon {
-        font-size: 3rem;
-        margin-bottom: 1rem;
-        display: block;
-    }
-    
-    .feature-title {
-        font-size: 1.5rem;
-        font-weight: 600;
-        color: var(--neon-green);
-        margin-bottom: 0.5rem;
-    }
-    
-    .feature-desc {
-        color: var(--text-muted);
-        font-size: 0.95rem;
-        line-height: 1.6;
-    }
-    
-    /* Sidebar styling */
-    [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #0f1629 0%, #1a2341 100%);
-        border-right: 2px solid var(--neon-green);
-    }
-    
-    [data-testid="stSidebar"] .stMarkdown {
-        color: var(--text-primary);
-    }
-    
-    /* Buttons */
-    .stButton > button {
-        background: linear-gradient(135deg, var(--neon-green) 0%, var(--cyber-blue) 100%);
-        color: var(--bg-primary);
-        font-weight: 600;
-        border: none;
-        border-radius: 10px;
-        padding: 0.75rem 2rem;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px var(--glow-green);
-        text-transform: uppercase;
-        letter-spacing: 1.5px;
-        font-size: 0.9rem;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-3px);
-        box-shadow: 0 8px 25px var(--glow-green);
-    }
-    
-    .stButton > button[kind="secondary"] {
-        background: transparent;
-        color: var(--neon-green);
-        border: 2px solid var(--neon-green);
-    }
-    
-    .stButton > button[kind="secondary"]:hover {
-        background: var(--neon-green);
-        color: var(--bg-primary);
-    }
-    
-    /* Input fields */
-    .stTextInput > div > div > input,
-    .stNumberInput > div > div > input,
-    .stSelectbox > div > div > select {
-        background: var(--bg-secondary);
-        color: var(--text-primary);
-        border: 2px solid rgba(0, 255, 157, 0.3);
-        border-radius: 10px;
-        padding: 0.75rem;
-        font-size: 1rem;
-    }
-    
-    .stTextInput > div > div > input:focus,
-    .stNumberInput > div > div > input:focus,
-    .stSelectbox > div > div > select:focus {
-        border-color: var(--neon-green);
-        box-shadow: 0 0 15px var(--glow-green);
-    }
-    
-    /* Progress bar */
-    .stProgress > div > div > div > div {
-        background: linear-gradient(90deg, var(--neon-green) 0%, var(--cyber-blue) 100%);
-        box-shadow: 0 0 15px var(--glow-green);
-        border-radius: 10px;
-    }
-    
-    /* Tabs */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 10px;
-        background: var(--bg-secondary);
-        border-radius: 15px;
-        padding: 1rem;
-        border: 1px solid rgba(0, 255, 157, 0.2);
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: transparent;
-        color: var(--text-muted);
-        border-radius: 10px;
-        padding: 0.75rem 1.5rem;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        border: 2px solid transparent;
-    }
-    
-    .stTabs [data-baseweb="tab"]:hover {
-        background: rgba(0, 255, 157, 0.1);
-        color: var(--neon-green);
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, rgba(0, 255, 157, 0.2) 0%, rgba(0, 212, 255, 0.2) 100%);
-        color: var(--neon-green) !important;
-        border: 2px solid var(--neon-green);
-    }
-    
-    /* Status indicators */
-    .status-indicator {
-        display: inline-flex;
-        align-items: center;
-        gap: 0.5rem;
-        padding: 0.5rem 1rem;
-        border-radius: 20px;
-        font-weight: 600;
-        font-size: 0.9rem;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }
-    
-    .status-active {
-        background: rgba(0, 255, 157, 0.2);
-        color: var(--neon-green);
-        border: 2px solid var(--neon-green);
-        animation: statusPulse 2s ease-in-out infinite;
-    }
-    
-    .status-idle {
-        background: rgba(139, 149, 176, 0.2);
-        color: var(--text-muted);
-        border: 2px solid var(--text-muted);
-    }
-    
-    @keyframes statusPulse {
-        0%, 100% { box-shadow: 0 0 10px var(--glow-green); }
-        50% { box-shadow: 0 0 20px var(--glow-green); }
-    }
-    
-    /* Results container */
-    .results-container {
-        background: var(--bg-secondary);
-        border: 2px solid var(--neon-green);
-        border-radius: 15px;
-        padding: 2rem;
-        margin: 2rem 0;
-        box-shadow: 0 5px 25px var(--glow-green);
-    }
-    
-    /* Bridge alert */
-    .bridge-alert {
-        background: linear-gradient(135deg, rgba(0, 212, 255, 0.2) 0%, rgba(0, 255, 157, 0.2) 100%);
-        border: 2px solid var(--cyber-blue);
-        border-radius: 10px;
-        padding: 1rem;
-        margin: 1rem 0;
-        animation: bridgePulse 2s ease-in-out infinite;
-    }
-    
-    @keyframes bridgePulse {
-        0%, 100% { box-shadow: 0 0 15px var(--glow-blue); }
-        50% { box-shadow: 0 0 25px var(--glow-blue); }
-    }
-    
-    /* Code blocks */
-    .stCodeBlock {
-        background: var(--bg-primary) !important;
-        border: 1px solid rgba(0, 255, 157, 0.3);
-        border-radius: 10px;
-    }
-    
-    code {
-        color: var(--neon-green) !important;
-        background: rgba(0, 255, 157, 0.1) !important;
-        padding: 0.2rem 0.5rem;
-        border-radius: 5px;
-    }
-    
-    /* JSON viewer */
-    .stJson {
-        background: var(--bg-primary);
-        border: 2px solid rgba(0, 255, 157, 0.3);
-        border-radius: 10px;
-        padding: 1rem;
-    }
-    
-    /* Expander */
-    div[data-testid="stExpander"] {
-        background: var(--bg-secondary);
-        border: 1px solid rgba(0, 255, 157, 0.3);
-        border-radius: 10px;
-        box-shadow: 0 2px 10px rgba(0, 255, 157, 0.1);
-    }
-    
-    div[data-testid="stExpander"]:hover {
-        border-color: var(--neon-green);
-        box-shadow: 0 4px 20px rgba(0, 255, 157, 0.2);
-    }
-    
-    /* Download button */
-    .stDownloadButton > button {
-        background: transparent;
-        color: var(--cyber-blue);
-        border: 2px solid var(--cyber-blue);
-        border-radius: 10px;
-        font-weight: 600;
-        transition: all 0.3s ease;
-    }
-    
-    .stDownloadButton > button:hover {
-        background: var(--cyber-blue);
-        color: var(--bg-primary);
-        box-shadow: 0 4px 15px rgba(0, 212, 255, 0.4);
-    }
-    
-    /* Metrics */
-    [data-testid="stMetricValue"] {
-        font-size: 2rem;
-        color: var(--neon-green);
-        font-weight: 700;
-    }
-    
-    /* Scrollbar */
-    ::-webkit-scrollbar {
-        width: 12px;
-        height: 12px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: var(--bg-primary);
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: linear-gradient(180deg, var(--neon-green) 0%, var(--cyber-blue) 100%);
-        border-radius: 10px;
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: linear-gradient(180deg, var(--cyber-blue) 0%, var(--neon-green) 100%);
-    }
-    
-    /* Divider */
-    hr {
-        border: none;
-        height: 2px;
-        background: linear-gradient(90deg, transparent, var(--neon-green), transparent);
-        margin: 2rem 0;
-    }
-    
-    /* Section headers */
-    .section-header {
-        font-size: 1.8rem;
-        font-weight: 700;
-        color: var(--neon-green);
-        text-transform: uppercase;
-        letter-spacing: 2px;
-        margin: 2rem 0 1rem 0;
-        padding-bottom: 0.5rem;
-        border-bottom: 2px solid var(--neon-green);
-    }
-    
-    /* Config panel */
-    .config-panel {
-        background: var(--bg-secondary);
-        border: 2px solid rgba(0, 255, 157, 0.3);
-        border-radius: 15px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-    }
-    
-    .config-panel:hover {
-        border-color: var(--neon-green);
-        box-shadow: 0 5px 20px rgba(0, 255, 157, 0.2);
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # Re-emitted every run: Streamlit drops any element that a rerun doesn't
+    # write again, so it can't be skipped.
+    try:
+        css, digest = _theme_css(THEME_CSS_PATH, os.path.getmtime(THEME_CSS_PATH))
+    except OSError:
+        return
+    if st.get_option("server.enableStaticServing"):
+        # The hash busts the browser cache when the file changes
+        st.markdown(f'<link rel="stylesheet" href="app/static/theme.css?v={digest}">', unsafe_allow_html=True)
+    else:
+        # st.html skips the markdown pipeline, and a style-only body goes to the
+        # event container instead of taking a slot in the page layout
+        st.html(f'<style data-theme="{digest}">\n{css}</style>')
 
 # Apply CSS right after page config
 apply_custom_css()
@@ -472,7 +200,8 @@ if "payload" not in st.session_state:
 if "web_payload" not in st.session_state:
     st.session_state.web_payload = None
 if "logbuf" not in st.session_state:
-    st.session_state.logbuf = ""
+    # Ring buffer of recent server log lines; appends are O(1) and memory stays bounded
+    st.session_state.logbuf = deque(maxlen=200)
 if "last_error" not in st.session_state:
     st.session_state.last_error = None
 
@@ -489,7 +218,36 @@ if "listen_bridge" not in st.session_state:
 # ---------------------------------------------------------------------
 # Utilities: module checks + installer
 # ---------------------------------------------------------------------
-def verify_current_python_has_modules(mod_imports: List[str]) -> Tuple[bool, str]:
+def _module_version(mod: str) -> str:
+    root = mod.split(".")[0]
+    for dist in importlib.metadata.packages_distributions().get(root, []):
+        try:
+            return importlib.metadata.version(dist)
+        except importlib.metadata.PackageNotFoundError:
+            continue
+    return "installed"
+
+# Installs from the sidebar clear this cache explicitly, so a long TTL is safe
+@st.cache_data(ttl=3600, show_spinner=False)
+def verify_current_python_has_modules(mod_imports: Tuple[str, ...]) -> Tuple[bool, str]:
+    """Check importability in-process via find_spec, without forking an interpreter.
+
+    The named module itself is not executed, but find_spec imports its parent
+    packages, so "googleapiclient.discovery" runs googleapiclient/__init__.py here.
+    """
+    missing = []
+    for m in mod_imports:
+        try:
+            if importlib.util.find_spec(m) is None:
+                missing.append(m)
+        except (ImportError, ValueError):
+            missing.append(m)
+    if missing:
+        return False, "Missing modules: " + ", ".join(missing)
+    return True, "\n".join(f"{m}={_module_version(m)}" for m in mod_imports)
+
+def probe_modules_subprocess(mod_imports: Tuple[str, ...]) -> Tuple[bool, str]:
+    """Authoritative check: actually import each module in a fresh interpreter."""
     probe = ["import sys"]
     for m in mod_imports:
         probe.append(f"import {m}; print('{m}=' + str(getattr({m}, '__version__', 'installed')))")
@@ -509,52 +267,208 @@ def install_required_packages(pkgs: List[str]) -> str:
     except subprocess.CalledProcessError as e:
         return e.output or str(e)
 
-def read_last_queue_event() -> Optional[dict]:
+def read_last_queue_event(path: Optional[str] = None) -> Optional[dict]:
     """Read the last valid JSON event from the bridge queue file."""
-    path = QUEUE_FILE
+    path = path or QUEUE_FILE
     if not os.path.exists(path):
         return None
     try:
-        last = None
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return None
+            # Map the file so tail scans only touch the pages they need
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                end = size
+                while end > 0:
+                    nl = mm.rfind(b"\n", 0, end)
+                    raw = mm[nl + 1:end].strip()
+                    end = max(nl, 0)
+                    if not raw:
+                        continue
+                    try:
+                        return _loads(raw)
+                    except Exception:
+                        # Skip a corrupt tail (e.g. a partial write) and keep walking back
+                        continue
+        return None
+    except Exception:
+        return None
+
+
+class QueueWatcher:
+    """Tracks the newest bridge event, reading only bytes appended since the last change."""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._lock = threading.Lock()
+        self._latest: Optional[dict] = read_last_queue_event(self.path)
+        self._offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        self._sig: Optional[Tuple[int, int]] = self._stat_sig()
+        self._observer = None
+        watch_dir = os.path.dirname(self.path)
+        if _WATCHDOG_OK and os.path.isdir(watch_dir):
+            watcher = self
+
+            class _Handler(FileSystemEventHandler):
+                def on_any_event(self, event):
+                    paths = (getattr(event, "src_path", None), getattr(event, "dest_path", None))
+                    if watcher.path in paths:
+                        watcher._catch_up()
+
+            self._observer = Observer()
+            self._observer.schedule(_Handler(), watch_dir, recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+
+    def _stat_sig(self) -> Optional[Tuple[int, int]]:
+        try:
+            st_ = os.stat(self.path)
+        except OSError:
+            return None
+        return (st_.st_mtime_ns, st_.st_size)
+
+    def _catch_up(self):
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                self._offset = 0
+                return
+            if size < self._offset:
+                # Queue was cleared or rotated by the bridge
+                self._offset = 0
+            if size == self._offset:
+                return
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read(size - self._offset)
+            end = chunk.rfind(b"\n")
+            if end == -1:
+                return  # record still being written
+            self._offset += end + 1
+            for raw in reversed(chunk[:end].split(b"\n")):
+                raw = raw.strip()
+                if not raw:
                     continue
                 try:
-                    last = json.loads(line)
+                    self._latest = _loads(raw)
+                    break
                 except Exception:
                     continue
-        return last
-    except Exception:
-        return None
+
+    def latest(self) -> Optional[dict]:
+        if self._observer is None:
+            sig = self._stat_sig()
+            if sig != self._sig:
+                self._sig = sig
+                self._catch_up()
+        with self._lock:
+            return self._latest
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+@st.cache_resource(show_spinner=False)
+def get_queue_watcher(path: str) -> QueueWatcher:
+    return QueueWatcher(path)
 
 
 # ---------------------------------------------------------------------
 # MCP stdio runner
 # ---------------------------------------------------------------------
+# The server's stdio must be UTF-8. Setting it on our own environment lets
+# Popen inherit it as-is instead of building a merged env dict per start();
+# it only affects child processes, this interpreter's streams are already set.
+os.environ["PYTHONIOENCODING"] = "utf-8"
+
+def _parse_progress(line: str) -> Optional[Tuple[str, int, int]]:
+    """Scan for "Processing <message|file> <cur>/<tot>" without the regex engine.
+
+    Matches the same lines as r"Processing\s+(message|file)\s+(\d+)\s*/\s*(\d+)"
+    with re.I | re.ASCII, given the caller's case-insensitive "rocessing" gate.
+    The scan runs on the lowercased line; lowering leaves digits, spaces and "/" alone.
+    """
+    line = line.lower()
+    n = len(line)
+    i = line.find("rocessing")
+    while i != -1:
+        if i >= 1 and line[i - 1] == "p":
+            k = i + 9
+            while k < n and line[k] in _ASCII_SPACE:
+                k += 1
+            if k > i + 9:
+                for kind in _PROGRESS_KINDS:
+                    j = k + len(kind)
+                    if line[k:j] != kind:
+                        continue
+                    p = j
+                    while p < n and line[p] in _ASCII_SPACE:
+                        p += 1
+                    if p == j:
+                        continue
+                    a = p
+                    while p < n and line[p] in _ASCII_DIGITS:
+                        p += 1
+                    if p == a:
+                        continue
+                    cur = int(line[a:p])
+                    while p < n and line[p] in _ASCII_SPACE:
+                        p += 1
+                    if p >= n or line[p] != "/":
+                        continue
+                    p += 1
+                    while p < n and line[p] in _ASCII_SPACE:
+                        p += 1
+                    b = p
+                    while p < n and line[p] in _ASCII_DIGITS:
+                        p += 1
+                    if p == b:
+                        continue
+                    return kind, cur, int(line[b:p])
+        i = line.find("rocessing", i + 1)
+    return None
+
 class MCPRunner:
     def __init__(self, server_path: str, rpc_timeout: float = 600.0):
         self.server_path = server_path
         self.rpc_timeout = rpc_timeout
         self.proc: Optional[subprocess.Popen] = None
         self._id = 1
-        self._stdout_q: "queue.Queue[Optional[str]]" = queue.Queue()
-        self._stderr_q: "queue.Queue[Optional[str]]" = queue.Queue()
-        self._stdout_thread: Optional[threading.Thread] = None
-        self._stderr_thread: Optional[threading.Thread] = None
+        # POSIX: both pipes are polled from the calling thread via a selector.
+        # Windows can't select() on pipes, so reader threads feed _events instead,
+        # one list of complete lines per chunk read.
+        self._sel: Optional[selectors.BaseSelector] = None
+        self._partial: Dict[str, bytearray] = {}
+        self._events: "queue.Queue[List[Tuple[str, Optional[bytes]]]]" = queue.Queue()
+        self._backlog: Deque[Tuple[str, Optional[bytes]]] = deque()
+        # Notifications waiting to be written in front of the next request
+        self._held: List[Dict[str, Any]] = []
+        self._reader_threads: List[threading.Thread] = []
         self.initialized = False
-        self._stderr_tail: List[str] = []
+        self._stderr_tail: Deque[bytes] = deque(maxlen=200)
+        # "all" forwards every stderr line to progress_cb; "progress" only progress updates
+        self.log_verbosity = "all"
+        # One stdio stream per server: sessions sharing this runner take turns
+        self.lock = threading.Lock()
+        self._warm_thread: Optional[threading.Thread] = None
+        # Set by stop(): an explicit stop is not undone by background warm-up, only by the next run
+        self._stopped = False
 
     def _next_id(self) -> int:
         rid = self._id
         self._id += 1
         return rid
 
+    def is_running(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
     def start(self):
-        if self.proc and self.proc.poll() is None:
+        if self.is_running():
             return
-        if not os.path.exists(self.server_path):
+        if not os.path.isfile(self.server_path):
             raise FileNotFoundError(f"Server not found: {self.server_path}")
 
         python_exe = sys.executable
@@ -563,33 +477,82 @@ class MCPRunner:
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            bufsize=1,
-            universal_newlines=True,
-            encoding="utf-8",
-            env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+            # Binary pipes: reads are split and decoded by hand, not per line by TextIOWrapper
+            bufsize=-1,
+            env=None,
             cwd=os.getcwd(),
         )
 
-        def _read_stdout():
-            assert self.proc and self.proc.stdout
-            for line in self.proc.stdout:
-                self._stdout_q.put(line.rstrip("\n"))
-            self._stdout_q.put(None)
-
-        def _read_stderr():
-            assert self.proc and self.proc.stderr
-            for line in self.proc.stderr:
-                self._stderr_q.put(line.rstrip("\n"))
-            self._stderr_q.put(None)
-
-        self._stdout_thread = threading.Thread(target=_read_stdout, daemon=True)
-        self._stderr_thread = threading.Thread(target=_read_stderr, daemon=True)
-        self._stdout_thread.start()
-        self._stderr_thread.start()
+        self._backlog.clear()
+        self._held = []
+        self._partial = {"out": bytearray(), "err": bytearray()}
+        if _USE_SELECTORS:
+            self._sel = selectors.DefaultSelector()
+            if hasattr(fcntl, "F_SETPIPE_SZ"):
+                try:
+                    fcntl.fcntl(self.proc.stdout.fileno(), fcntl.F_SETPIPE_SZ, _STDOUT_PIPE_SZ)
+                except OSError:
+                    pass  # above /proc/sys/fs/pipe-max-size; the default size still works
+            for stream, tag in ((self.proc.stdout, "out"), (self.proc.stderr, "err")):
+                os.set_blocking(stream.fileno(), False)
+                self._sel.register(stream.fileno(), selectors.EVENT_READ, tag)
+        else:
+            self._events = queue.Queue()
+
+            def _reader(stream, tag):
+                # Each thread only touches its own stream's _partial buffer
+                while True:
+                    data = stream.read1(_READ_SIZE[tag])
+                    batch = self._feed(tag, data)
+                    if batch:
+                        self._events.put(batch)
+                    if not data:
+                        return
+
+            self._reader_threads = [
+                threading.Thread(target=_reader, args=(self.proc.stdout, "out"), daemon=True),
+                threading.Thread(target=_reader, args=(self.proc.stderr, "err"), daemon=True),
+            ]
+            for t in self._reader_threads:
+                t.start()
         self.initialized = False
+        self._stopped = False
         self._id = 1
         self._stderr_tail.clear()
 
+    def warm_up(self):
+        """Spawn the server and finish the MCP handshake on a background thread, once per server process.
+
+        The audit path takes the same lock, so a click during warm-up waits for it
+        (see acquire_runner) and then goes straight to tools/call. The handshake gets
+        WARM_UP_TIMEOUT rather than rpc_timeout; a server that hangs in it is stopped
+        so the next run starts a fresh one with the full timeout. If the server
+        dies the next call warms a fresh one; after Stop Server, warm-up resumes once
+        a run has started the server again. A handshake that failed on a live server
+        is left for the audit button to retry and report.
+        """
+        if self._stopped or (self.initialized and self.is_running()):
+            return
+        if self._warm_thread is not None and (self._warm_thread.is_alive() or self.is_running()):
+            return
+
+        def _warm():
+            with self.lock:
+                try:
+                    if not self.is_running():
+                        self.start()
+                    self.ensure_initialized(timeout=WARM_UP_TIMEOUT)
+                except TimeoutError:
+                    self.stop()
+                except Exception:
+                    pass  # the audit button reports start/handshake errors with full context
+
+        self._warm_thread = threading.Thread(target=_warm, daemon=True)
+        self._warm_thread.start()
+
+    def is_warming(self) -> bool:
+        return self._warm_thread is not None and self._warm_thread.is_alive()
+
     def stop(self):
         try:
             if self.proc and self.proc.poll() is None:
@@ -600,87 +563,166 @@ class MCPRunner:
                     self.proc.kill()
                     self.proc.wait(timeout=3)
         finally:
+            if self._sel is not None:
+                self._sel.close()
+                self._sel = None
             self.proc = None
             self.initialized = False
+            self._stopped = True
 
     def _send(self, obj: Dict[str, Any], expect_response: bool = True):
+        if not expect_response:
+            # Notifications need no reply, so they ride along with the next request's write
+            self._held.append(obj)
+            return
+        self._send_many([obj])
+
+    def _send_many(self, objs: List[Dict[str, Any]]):
+        """Write several NDJSON frames (after any held notifications) with a single write()+flush()."""
         if not self.proc or not self.proc.stdin or self.proc.poll() is not None:
             raise RuntimeError("Server is not running")
-        payload = json.dumps(obj, separators=(",", ":")) + "\n"
+        if self._held:
+            objs = self._held + objs
+            self._held = []
+        payload = b"".join(_dumpb(o) + b"\n" for o in objs)
         self.proc.stdin.write(payload)
         self.proc.stdin.flush()
 
-    def _drain_stderr_for_progress(self, progress_cb):
-        while True:
+    def _feed(self, tag: str, data: bytes) -> List[Tuple[str, Optional[bytes]]]:
+        """Add a raw chunk to the stream's buffer and return its complete lines; b"" means EOF."""
+        buf = self._partial[tag]
+        if not data:
+            events: List[Tuple[str, Optional[bytes]]] = []
+            if buf:
+                events.append((tag, bytes(buf).rstrip(b"\r")))
+                buf.clear()
+            events.append((tag, None))
+            return events
+        buf += data
+        if b"\n" not in data:
+            return []
+        *lines, rest = buf.split(b"\n")
+        self._partial[tag] = bytearray(rest)
+        return [(tag, raw.rstrip(b"\r")) for raw in lines]
+
+    def _read_events(self, timeout: float) -> List[Tuple[str, Optional[bytes]]]:
+        """Block up to `timeout` for pipe output; return (stream, line) pairs, line=None on EOF."""
+        if self._backlog:
+            events = list(self._backlog)
+            self._backlog.clear()
+            return events
+
+        events: List[Tuple[str, Optional[bytes]]] = []
+        if not _USE_SELECTORS:
             try:
-                line = self._stderr_q.get_nowait()
+                events.extend(self._events.get(timeout=timeout))
+                while True:
+                    events.extend(self._events.get_nowait())
             except queue.Empty:
-                break
-            if line is None:
-                if progress_cb:
-                    progress_cb("log", None, None, "[server stderr closed]")
-                break
-
-            self._stderr_tail.append(line)
-            self._stderr_tail[:] = self._stderr_tail[-50:]
-
-            m = RE_PROGRESS.search(line)
-            if m and progress_cb:
-                kind = m.group(1).lower()
-                cur = int(m.group(2))
-                tot = int(m.group(3))
+                pass
+            return events
+
+        if self._sel is None or not self._sel.get_map():
+            time.sleep(timeout)
+            return events
+        for key, _ in self._sel.select(timeout=timeout):
+            data = os.read(key.fd, _READ_SIZE[key.data])
+            if not data:
+                self._sel.unregister(key.fd)
+            events.extend(self._feed(key.data, data))
+        return events
+
+    def _handle_stderr(self, raw: Optional[bytes], progress_cb, log_lines: List[str]):
+        """Record one stderr line; lines to forward as logs are collected into log_lines.
+
+        Lines stay bytes in the tail and are only decoded when something reads them:
+        a progress match, log streaming, or an error message.
+        """
+        want_logs = progress_cb is not None and self.log_verbosity == "all"
+        if raw is None:
+            if want_logs:
+                log_lines.append("[server stderr closed]")
+            return
+
+        self._stderr_tail.append(raw)
+
+        line = None
+        # Cheap substring gate (ASCII case-folded, like the parser): most log lines are never decoded for it
+        if progress_cb and b"rocessing" in raw.lower():
+            line = raw.decode("utf-8", "replace")
+            m = _parse_progress(line)
+            if m:
+                kind, cur, tot = m
                 progress_cb(kind, cur, tot, line)
 
-            if progress_cb:
-                progress_cb("log", None, None, line)
+        if want_logs:
+            log_lines.append(line if line is not None else raw.decode("utf-8", "replace"))
+
+    def _log_tail(self, n: int) -> str:
+        return "\n".join(raw.decode("utf-8", "replace") for raw in list(self._stderr_tail)[-n:])
+
+    def drain_logs(self) -> List[str]:
+        """Return the buffered stderr lines and start a fresh tail."""
+        lines = [raw.decode("utf-8", "replace") for raw in self._stderr_tail]
+        self._stderr_tail.clear()
+        return lines
 
-    def _wait_for_id(self, target_id: int, progress_cb=None) -> Dict[str, Any]:
-        start = time.time()
+    def _wait_for_id(self, target_id: int, progress_cb=None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        # Monotonic deadlines: immune to wall-clock jumps, one subtraction per wait
+        deadline = time.monotonic() + (self.rpc_timeout if timeout is None else timeout)
         grace_after_eof = 0.4
-        saw_stdout_eof = False
+        eof_deadline: Optional[float] = None
 
         while True:
-            if time.time() - start > self.rpc_timeout:
-                tail = "\n".join(self._stderr_tail[-10:])
+            now = time.monotonic()
+            if now >= deadline:
+                tail = self._log_tail(10)
                 raise TimeoutError(f"Timed out waiting for response id={target_id}\n\nLast server logs:\n{tail}")
+            if eof_deadline is not None and now >= eof_deadline:
+                tail = self._log_tail(20)
+                raise RuntimeError("Server stdout closed before response arrived\n\nLast server logs:\n" + tail)
+
+            # One blocking wait until a pipe is readable or the nearest deadline passes
+            wait_until = deadline if eof_deadline is None else min(deadline, eof_deadline)
+            events = self._read_events(wait_until - now)
+
+            # Log lines from one read go to progress_cb as a single newline-joined call
+            log_lines: List[str] = []
+            for i, (tag, line) in enumerate(events):
+                if tag == "err":
+                    self._handle_stderr(line, progress_cb, log_lines)
+                    continue
+                if line is None:
+                    # Give stderr a moment to explain why the server went away
+                    if eof_deadline is None:
+                        eof_deadline = time.monotonic() + grace_after_eof
+                    continue
 
-            self._drain_stderr_for_progress(progress_cb)
-
-            try:
-                line = self._stdout_q.get(timeout=0.1)
-            except queue.Empty:
-                continue
-
-            if line is None:
-                if not saw_stdout_eof:
-                    saw_stdout_eof = True
-                    end_by = time.time() + grace_after_eof
-                    while time.time() < end_by:
-                        self._drain_stderr_for_progress(progress_cb)
-                        try:
-                            line2 = self._stdout_q.get(timeout=0.05)
-                        except queue.Empty:
-                            continue
-                        if line2 is None:
-                            continue
-                        line = line2
-                        break
-                    else:
-                        tail = "\n".join(self._stderr_tail[-20:])
-                        raise RuntimeError("Server stdout closed before response arrived\n\nLast server logs:\n" + tail)
-                else:
-                    tail = "\n".join(self._stderr_tail[-20:])
-                    raise RuntimeError("Server stdout closed before response arrived\n\nLast server logs:\n" + tail)
-
-            try:
-                obj = json.loads(line)
-            except Exception:
-                continue
-
-            if isinstance(obj, dict) and obj.get("id") == target_id:
-                return obj
+                # JSON-RPC responses are single-line objects carrying an "id";
+                # skip banners and notifications without paying for a failed parse
+                if not line.startswith(b"{") or b'"id"' not in line:
+                    continue
+                try:
+                    obj = _loads(line)
+                except Exception:
+                    continue
 
-    def ensure_initialized(self, progress_cb=None):
+                if isinstance(obj, dict) and obj.get("id") == target_id:
+                    # stderr from the same read belongs to this call (the server usually logs
+                    # right before replying); only later stdout frames wait for the next one
+                    for tag2, rest in events[i + 1:]:
+                        if tag2 == "err":
+                            self._handle_stderr(rest, progress_cb, log_lines)
+                        else:
+                            self._backlog.append((tag2, rest))
+                    if log_lines:
+                        progress_cb("log", None, None, "\n".join(log_lines))
+                    return obj
+
+            if log_lines:
+                progress_cb("log", None, None, "\n".join(log_lines))
+
+    def ensure_initialized(self, progress_cb=None, timeout: Optional[float] = None):
         if self.initialized:
             return
         init_id = self._next_id()
@@ -694,7 +736,7 @@ class MCPRunner:
                 "clientInfo": {"name": "streamlit-ui", "version": "1.0.0"},
             },
         })
-        resp = self._wait_for_id(init_id, progress_cb=progress_cb)
+        resp = self._wait_for_id(init_id, progress_cb=progress_cb, timeout=timeout)
         if "error" in resp:
             raise RuntimeError(f"initialize failed: {resp['error']}")
         self._send({"jsonrpc": "2.0", "method": "notifications/initialized"}, expect_response=False)
@@ -715,10 +757,462 @@ class MCPRunner:
             raise RuntimeError(f"tools/call failed: {resp['error']}")
         return resp["result"]
 
+# How long a run waits for another session's turn on the shared server before giving up
+RUNNER_LOCK_WAIT = 10.0
+# Background start + initialize; a click waits this long for its own warm-up to finish
+WARM_UP_TIMEOUT = 30.0
+
+def acquire_runner(runner: MCPRunner, status) -> bool:
+    """Take runner.lock for a run, or explain in `status` why the server isn't free.
+
+    Never blocks the script thread unboundedly: Streamlit can't interrupt a thread
+    waiting on a lock, so a stuck wait would freeze the session.
+    """
+    warming = runner.is_warming()
+    if runner.lock.acquire(timeout=WARM_UP_TIMEOUT if warming else RUNNER_LOCK_WAIT):
+        return True
+    if runner.is_warming():
+        status.warning("⏳ The MCP server is still starting up. Try again in a moment.")
+    else:
+        status.warning("⏳ The MCP server is busy with another session's run. Try again when it finishes.")
+    return False
+
+@st.cache_resource(show_spinner=False)
+def get_runner(server_path: str) -> MCPRunner:
+    """One MCP server per path for the whole process, so its handshake and OAuth survive reruns and sessions."""
+    runner = MCPRunner(server_path)
+    # Nobody owns the shared server, so take it down with the Streamlit process
+    atexit.register(runner.stop)
+    return runner
+
+# ---------------------------------------------------------------------
+# Run progress (progress bar, status line and log panel of an audit panel)
+# ---------------------------------------------------------------------
+class RunProgress:
+    """Throttled painter for one run; `progress_cb` is handed to the MCP runner."""
+
+    def __init__(self, progress_bar, status_text, live_log):
+        self.progress_bar = progress_bar
+        self.status_text = status_text
+        self.live_log = live_log
+        self.last_log_flush = 0.0
+        self.log_dirty = False
+        self.last_progress_push = 0.0
+        self.last_pct_q = -1
+
+    def append_log(self, lines: List[str]):
+        if lines:
+            st.session_state.logbuf.extend(lines)
+            self.log_dirty = True
+
+    def flush_log(self):
+        # Only repaint when lines arrived since the last paint
+        self.last_log_flush = time.monotonic()
+        if self.log_dirty:
+            self.log_dirty = False
+            self.live_log.code("\n".join(st.session_state.logbuf), language="text")
+
+    def progress_cb(self, kind: str, cur: Optional[int], tot: Optional[int], raw_line: str):
+        is_progress = kind in ("message", "file") and isinstance(cur, int) and isinstance(tot, int) and tot > 0
+        # Progress lines also arrive as their own "log" event, so only those feed the panel
+        if kind == "log" and raw_line:
+            self.append_log(raw_line.splitlines())
+            # Repaint the log panel at most every 200 ms; the run's finally block paints the rest
+            if time.monotonic() - self.last_log_flush > 0.2:
+                self.flush_log()
+        if is_progress:
+            pct = int(cur / tot * 100)
+            pct_q = pct // 5 * 5
+            # Push only when the 5% grid step changes, at most every 50 ms; the final tick always goes out
+            if cur == tot or (pct_q != self.last_pct_q and time.monotonic() - self.last_progress_push >= 0.05):
+                self.last_progress_push = time.monotonic()
+                self.last_pct_q = pct_q
+                self.progress_bar.progress(pct, text=f"⚡ {kind.title()}: {cur}/{tot} ({pct}%)")
+                self.status_text.markdown(f"**Processing**: `{cur}/{tot}` {kind}s")
+
+# ---------------------------------------------------------------------
+# Perplexity client (OpenAI-compatible)
+# ---------------------------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def get_pplx_client(api_key: str):
+    """One pooled client per API key, reused across reruns so keep-alive connections survive."""
+    return _get_openai()(api_key=api_key, base_url="https://api.perplexity.ai")
+
+@st.cache_resource(show_spinner=False)
+def _ai_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="pplx")
+
+def ai_memo(namespace: str, payload: Any) -> Dict[str, str]:
+    """Finished AI texts for one audit payload, keyed by its content hash.
+
+    Kept in session_state (not st.cache_data) so one user's analyses are never
+    served to another session. The hash is only computed when a new payload
+    object arrives; re-running an audit that returns identical data keeps the
+    earlier analyses.
+    """
+    memos = st.session_state.setdefault("_ai_memos", {})
+    entry = memos.get(namespace)
+    if entry is None or entry[0] is not payload:
+        digest = hashlib.blake2b(payload_json(payload), digest_size=16).hexdigest()
+        results = entry[2] if entry is not None and entry[1] == digest else {}
+        entry = (payload, digest, results)
+        memos[namespace] = entry
+    return entry[2]
+
+def stream_ai_results(calls: List[Tuple[Any, ...]], memo: Optional[Dict[str, str]] = None, tick: float = 0.1) -> List[str]:
+    """Run (placeholder, key, fn, *args) AI calls on worker threads and stream their text.
+
+    Each fn receives a `parts` list it appends tokens to. Streamlit elements may only
+    be updated from the script thread, so this thread repaints every placeholder
+    from its parts list until all calls finish, then returns the final texts.
+    Keys already in `memo` are rendered from it without calling the API again.
+
+    In-flight calls are parked in session_state, so a rerun that interrupts the
+    stream (any widget click) picks the same request back up instead of paying
+    for a second one; the model keeps generating in the background meanwhile.
+    """
+    memo = {} if memo is None else memo
+    pending = st.session_state.setdefault("_ai_pending", {})
+    jobs = []
+    for placeholder, key, fn, *args in calls:
+        parts: List[str] = []
+        fut = None
+        if key not in memo:
+            entry = pending.get(key)
+            if entry is not None and entry[0] is memo:
+                _, fut, parts = entry
+            else:
+                fut = _ai_pool().submit(fn, *args, parts=parts)
+                pending[key] = (memo, fut, parts)
+            placeholder.info("⏳ Waiting for the model...")
+        jobs.append((key, fut, parts, placeholder))
+
+    shown = [0] * len(jobs)
+    while not all(fut is None or fut.done() for _, fut, _, _ in jobs):
+        for i, (_, fut, parts, placeholder) in enumerate(jobs):
+            if fut is not None and len(parts) != shown[i]:
+                shown[i] = len(parts)
+                placeholder.markdown("".join(parts) + " ▌")
+        time.sleep(tick)
+
+    results = []
+    for key, fut, _, placeholder in jobs:
+        if fut is not None:
+            # Drop the parked call first so a failed one is retried on the next run
+            pending.pop(key, None)
+            memo[key] = fut.result()
+        placeholder.success(memo[key])
+        results.append(memo[key])
+    return results
+
+# ---------------------------------------------------------------------
+# Result serialization
+# ---------------------------------------------------------------------
+def _identity_memo(slot: str, obj: Any, build: Callable[[Any], Any]) -> Any:
+    """build(obj), kept in session_state[slot] until a different object is passed.
+
+    Hashing a large dict for st.cache_data costs more than serializing it, so
+    results are tied to the payload object they were built from instead.
+    """
+    memo = st.session_state.get(slot)
+    if memo is None or memo[0] is not obj:
+        memo = (obj, build(obj))
+        st.session_state[slot] = memo
+    return memo[1]
+
+def payload_json(obj: Any) -> bytes:
+    """Pretty-printed JSON for a result payload, serialized once per payload object."""
+    return _identity_memo("_payload_json", obj, _dumpb_pretty)
+
+JSON_PREVIEW_LIMIT = 200_000
+
+def show_payload_json(payload: Any, key: str):
+    """Collapsed JSON viewer; payloads over JSON_PREVIEW_LIMIT bytes start as a truncated text preview."""
+    blob = payload_json(payload)
+    if len(blob) > JSON_PREVIEW_LIMIT and not st.checkbox(
+        f"Show full JSON ({len(blob) // 1024:,} KB)", key=key
+    ):
+        preview = blob[:JSON_PREVIEW_LIMIT].decode("utf-8", "ignore")
+        st.code(preview + "\n... (truncated)", language="json")
+        return
+    # st.json sends str bodies as-is, so hand it a compact dump made once per
+    # payload rather than letting it json.dumps the whole object on every rerun
+    st.json(_identity_memo("_payload_json_view", payload, lambda o: _dumpb(o).decode("utf-8")), expanded=False)
+
+# ---------------------------------------------------------------------
+# Plain-text reports (built only when a "Download Report" button is clicked)
+# ---------------------------------------------------------------------
+def _gmail_header(msg: dict, name: str) -> str:
+    for h in (msg.get("payload") or {}).get("headers", []) or []:
+        if str(h.get("name", "")).lower() == name:
+            return str(h.get("value", ""))
+    return ""
+
+def build_gmail_drive_report(payload: Dict[str, Any]) -> str:
+    """Human-readable summary of a Gmail/Drive audit payload."""
+    out = [
+        "PRIVACY AUDIT REPORT - GMAIL / DRIVE",
+        f"Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+    ]
+
+    gmail = payload.get("gmail")
+    if gmail is not None:
+        out.append("GMAIL")
+        if isinstance(gmail, dict):
+            if gmail.get("error"):
+                out.append(f"  Error: {gmail['error']}")
+            else:
+                out.append(f"  Messages checked: {gmail.get('total_messages_checked', 0)}")
+                for finding in gmail.get("findings", []) or []:
+                    out.append(f"  - {finding}")
+        elif isinstance(gmail, list):
+            msgs = [m for m in gmail if isinstance(m, dict)]
+            out.append(f"  Messages checked: {len(msgs)}")
+            senders: Dict[str, int] = {}
+            for m in msgs:
+                sender = _gmail_header(m, "from") or "(unknown sender)"
+                senders[sender] = senders.get(sender, 0) + 1
+            if senders:
+                out.append("  Senders:")
+                for sender, n in sorted(senders.items(), key=lambda kv: -kv[1])[:10]:
+                    out.append(f"    - {sender} ({n})")
+            for m in msgs:
+                out.append(f"  * {_gmail_header(m, 'subject') or '(no subject)'}")
+                if m.get("snippet"):
+                    out.append(f"      {m['snippet'][:160]}")
+        out.append("")
+
+    drive = payload.get("drive")
+    if drive is not None:
+        out.append("GOOGLE DRIVE")
+        if isinstance(drive, dict) and drive.get("error"):
+            out.append(f"  Error: {drive['error']}")
+        else:
+            files = (drive.get("files") if isinstance(drive, dict) else drive) or []
+            files = [f for f in files if isinstance(f, dict)]
+            public = [f for f in files if any(p.get("type") == "anyone" for p in f.get("permissions", []) or [])]
+            shared = [f for f in files if f.get("shared")]
+            out.append(f"  Files checked: {len(files)}")
+            out.append(f"  Shared files: {len(shared)}")
+            out.append(f"  Public (anyone with the link): {len(public)}")
+            for f in files:
+                flag = "PUBLIC" if f in public else ("shared" if f.get("shared") else "private")
+                out.append(f"  - [{flag}] {f.get('name', '(unnamed)')}")
+                for p in f.get("permissions", []) or []:
+                    who = p.get("emailAddress") or p.get("domain") or p.get("type", "")
+                    out.append(f"      {p.get('role', '?')}: {who}")
+        out.append("")
+
+    return "\n".join(out)
+
+def build_website_report(payload: Any) -> str:
+    """Human-readable summary of a website audit payload."""
+    if not isinstance(payload, dict):
+        return str(payload)
+    out = [
+        "PRIVACY AUDIT REPORT - WEBSITE",
+        f"Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        f"URL:         {payload.get('url', '')}",
+        f"Final URL:   {payload.get('final_url') or '-'}",
+        f"HTTP status: {payload.get('status') or '-'}",
+        f"Scan mode:   {payload.get('mode_used', '-')}",
+    ]
+    if payload.get("fallback_reason"):
+        out.append(f"Fallback:    {payload['fallback_reason']}")
+    if payload.get("error"):
+        out.append(f"Error:       {payload['error']}")
+    out.append("")
+
+    security = payload.get("security") or {}
+    out.append("SECURITY")
+    out.append(f"  HTTPS: {'yes' if security.get('https') else 'no'}")
+    for name, value in (security.get("headers") or {}).items():
+        out.append(f"  {name}: {'present' if value else 'MISSING'}")
+    out.append("")
+
+    domains = set(((payload.get("resources") or {}).get("third_party") or {}).get("domains", []) or [])
+    for req in (payload.get("network") or {}).get("requests", []) or []:
+        if req.get("thirdParty") and req.get("url"):
+            host = req["url"].split("/")[2] if "://" in req["url"] else ""
+            if host:
+                domains.add(host)
+    out.append(f"THIRD PARTIES ({len(domains)})")
+    out.extend(f"  - {d}" for d in sorted(domains))
+    out.append("")
+
+    forms = payload.get("forms") or []
+    out.append(f"FORMS ({len(forms)})")
+    for f in forms:
+        pii = ", ".join(f"{k} x{v}" for k, v in (f.get("pii_summary") or {}).items()) or "no PII fields"
+        out.append(f"  - {f.get('method', 'GET')} {f.get('action', '')}: {pii}")
+    out.append("")
+
+    flags = payload.get("policy_flags") or []
+    out.append(f"POLICY FLAGS ({len(flags)})")
+    for fl in flags:
+        out.append(f"  - [{str(fl.get('severity', '?')).upper()}] {fl.get('id', '')}: {fl.get('evidence', '')}")
+    out.append("")
+
+    policies = payload.get("policies") or []
+    out.append(f"POLICIES FETCHED ({len(policies)})")
+    for p in policies:
+        out.append(f"  - {p.get('url', '')} ({p.get('error') or p.get('status', '-')})")
+
+    return "\n".join(out)
+
+# ---------------------------------------------------------------------
+# AI input (the parts of a payload the analysis prompt actually reads)
+# ---------------------------------------------------------------------
+AI_LIST_CAP = 50
+
+def _cookie_names(jar: Any) -> List[str]:
+    return [f"{c.get('name')}@{c.get('domain')}" for c in (jar or [])[:AI_LIST_CAP * 2] if isinstance(c, dict)]
+
+def project_website_for_ai(payload: Any) -> Any:
+    """Compact view of a website audit for WEBSITE_SYSTEM_PROMPT.
+
+    Keeps what the six summary sections ask about (consent cookie diffs, third-party
+    domains, form PII, security headers, policy facts and flags) and drops the bulk:
+    every network request, first-party assets, cookie values and policy snippets.
+    Fewer input tokens means a faster first token and a cheaper call; cookie values
+    also never need to leave the machine.
+    """
+    if not isinstance(payload, dict):
+        return payload
+    view = {k: payload.get(k) for k in ("url", "final_url", "status", "mode_used", "fallback_reason", "error") if payload.get(k)}
+
+    consent = payload.get("consent")
+    if isinstance(consent, dict):
+        view["consent_cookies"] = {stage: _cookie_names(jar) for stage, jar in consent.items()}
+    cookies = payload.get("cookies")
+    if isinstance(cookies, dict):
+        view["cookies"] = {
+            "response": _cookie_names(cookies.get("response")),
+            "set_cookie_names": [h.split("=", 1)[0] for h in (cookies.get("set_cookie_headers") or [])[:AI_LIST_CAP]],
+        }
+
+    network = payload.get("network") or {}
+    resources = payload.get("resources") or {}
+    third = resources.get("third_party") or {}
+    domains = set(network.get("thirdParties") or []) | set(third.get("domains") or [])
+    # Hosts the server classified as analytics/ads/social go first, so the cap never hides a tracker
+    tracker_hosts = {
+        e.get("host")
+        for kind in ("scripts", "links", "imgs")
+        for e in third.get(kind) or []
+        if isinstance(e, dict) and e.get("category") not in (None, "other")
+    }
+    view["third_party_domains"] = sorted(domains, key=lambda h: (h not in tracker_hosts, h))[:AI_LIST_CAP]
+    view["third_party_domains_total"] = len(domains)
+    if network.get("requests"):
+        reqs = network["requests"]
+        view["requests"] = {
+            "total": len(reqs),
+            "third_party": sum(1 for r in reqs if r.get("thirdParty")),
+            "set_cookie_names": sorted({h.split("=", 1)[0] for h in network.get("set_cookie_headers") or []})[:AI_LIST_CAP],
+        }
+
+    view["forms"] = [
+        {
+            "action": f.get("action"),
+            "method": f.get("method"),
+            "pii_summary": f.get("pii_summary"),
+            "fields": [{"name": x.get("name"), "type": x.get("type"), "required": x.get("required")} for x in (f.get("fields") or [])[:AI_LIST_CAP]],
+        }
+        for f in (payload.get("forms") or [])[:10]
+    ]
+    view["security"] = payload.get("security")
+    view["policies"] = [
+        {k: p.get(k) for k in ("url", "status", "facts", "error") if k in p}
+        for p in (payload.get("policies") or [])
+    ]
+    view["policy_flags"] = payload.get("policy_flags") or []
+    return view
+
+GMAIL_AI_HEADERS = ("from", "to", "cc", "bcc", "reply-to", "subject", "date", "list-unsubscribe")
+
+def _gmail_attachments(part: Any) -> List[Dict[str, Any]]:
+    out = []
+    stack = [part]
+    while stack:
+        p = stack.pop()
+        if not isinstance(p, dict):
+            continue
+        if p.get("filename"):
+            out.append({"filename": p["filename"], "mimeType": p.get("mimeType"), "size": (p.get("body") or {}).get("size")})
+        stack.extend(p.get("parts") or [])
+    return out
+
+def project_gmail_for_ai(payload: Any) -> Any:
+    """Compact view of check_gmail_privacy output for the Gmail prompt.
+
+    Full-format messages carry every header and base64 body part; the analysis only
+    needs who/what/when, labels, the snippet and attachment names. Non-list payloads
+    (errors, "no recent messages") pass through unchanged.
+    """
+    if not isinstance(payload, list):
+        return payload
+    view = []
+    for msg in payload[:AI_LIST_CAP]:
+        if not isinstance(msg, dict):
+            continue
+        body = msg.get("payload") or {}
+        headers = {}
+        for h in body.get("headers") or []:
+            name = (h.get("name") or "").lower()
+            if name in GMAIL_AI_HEADERS:
+                headers[name] = h.get("value")
+        view.append({
+            "id": msg.get("id"),
+            "labels": msg.get("labelIds") or [],
+            "headers": headers,
+            "snippet": msg.get("snippet"),
+            "attachments": _gmail_attachments(body)[:AI_LIST_CAP],
+        })
+    if len(payload) > AI_LIST_CAP:
+        return {"messages": view, "total_messages": len(payload)}
+    return view
+
+def project_drive_for_ai(payload: Any) -> Any:
+    """Compact view of check_drive_privacy output for the Drive prompt.
+
+    Keeps names, sharing state, owners and who each permission grants access to;
+    drops display names, photo links and other per-permission decoration.
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get("files"), list):
+        return payload
+    files = payload["files"]
+    return {
+        "total_files_checked": payload.get("total_files_checked", len(files)),
+        "files": [
+            {
+                "name": f.get("name"),
+                "mimeType": f.get("mimeType"),
+                "shared": f.get("shared"),
+                "webViewLink": f.get("webViewLink"),
+                "modifiedTime": f.get("modifiedTime"),
+                "owners": [o.get("emailAddress") for o in (f.get("owners") or []) if isinstance(o, dict)],
+                "permissions": [
+                    {k: p[k] for k in ("type", "role", "emailAddress", "domain", "allowFileDiscovery") if k in p}
+                    for p in (f.get("permissions") or [])[:AI_LIST_CAP]
+                    if isinstance(p, dict)
+                ],
+            }
+            for f in files[:AI_LIST_CAP]
+            if isinstance(f, dict)
+        ],
+    }
+
 # ---------------------------------------------------------------------
 # Check for server file
 # ---------------------------------------------------------------------
-if not os.path.exists("mvp.py"):
+@st.cache_data(ttl=60, show_spinner=False)
+def _server_present(path: str) -> bool:
+    return os.path.isfile(path)
+
+if not _server_present("mvp.py"):
     st.error("⚠️ No MCP server file found. Make sure `mvp.py` is in this folder.")
     st.stop()
 
@@ -733,21 +1227,29 @@ with st.sidebar:
     server_path = "mvp.py"
     timeout = st.number_input("⏱️ Timeout (seconds)", min_value=30, max_value=7200, value=600, step=30)
     use_ai = st.checkbox("🤖 Enable AI Analysis", value=True)
+    stream_logs = st.checkbox(
+        "📜 Stream Server Logs",
+        value=False,
+        help="Update the log panel live during audits. When off, it is filled once the run ends.",
+    )
     
     st.markdown("---")
     st.markdown("### 📊 SYSTEM STATUS")
     
     # Module check
-    ok, msg = verify_current_python_has_modules([
-        "mcp",
-        "googleapiclient.discovery",
-        "google_auth_oauthlib.flow",
-    ])
+    required_mods = REQUIRED_IMPORTS
+    ok, msg = verify_current_python_has_modules(required_mods)
     
     if ok:
         st.markdown('<div class="status-indicator status-active">🟢 MODULES OK</div>', unsafe_allow_html=True)
         with st.expander("📋 View Details"):
             st.code(msg, language="text")
+            if st.button("🔄 Force Re-check", type="secondary", use_container_width=True):
+                verify_current_python_has_modules.clear()
+                ok_sub, msg_sub = probe_modules_subprocess(required_mods)
+                if not ok_sub:
+                    st.error("❌ Import failed in a fresh interpreter.")
+                st.code(msg_sub, language="text")
         can_run = True
     else:
         st.markdown('<div class="status-indicator status-idle">🔴 MODULES MISSING</div>', unsafe_allow_html=True)
@@ -755,12 +1257,10 @@ with st.sidebar:
         if st.button("📦 Install Packages", type="secondary", use_container_width=True):
             out = install_required_packages(REQUIRED_PIP_PKGS)
             st.code(out, language="text")
-            ok2, msg2 = verify_current_python_has_modules([
-                "mcp",
-                "googleapiclient.discovery",
-                "google_auth_oauthlib.flow",
-            ])
+            ok2, msg2 = probe_modules_subprocess(required_mods)
             if ok2:
+                importlib.invalidate_caches()
+                verify_current_python_has_modules.clear()
                 st.success("✅ Installed successfully!")
                 st.rerun()
             else:
@@ -773,13 +1273,21 @@ with st.sidebar:
     if st.session_state.runner and st.session_state.runner.initialized:
         st.markdown('<div class="status-indicator status-active">🟢 SERVER ACTIVE</div>', unsafe_allow_html=True)
         if st.button("⏹ Stop Server", type="secondary", use_container_width=True):
-            try:
-                st.session_state.runner.stop()
-                st.session_state.runner = None
-                st.success("Server stopped.")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Stop error: {e}")
+            runner = st.session_state.runner
+            # The server is shared by every session; never pull it out from under a running audit
+            if not runner.lock.acquire(blocking=False):
+                st.warning("⏳ An audit is running on this server. Stop it once that finishes.")
+            else:
+                try:
+                    runner.stop()
+                    st.session_state.runner = None
+                    st.success("Server stopped.")
+                except Exception as e:
+                    st.error(f"Stop error: {e}")
+                finally:
+                    runner.lock.release()
+                if st.session_state.runner is None:
+                    st.rerun()
     else:
         st.markdown('<div class="status-indicator status-idle">⚪ SERVER IDLE</div>', unsafe_allow_html=True)
     
@@ -963,68 +1471,66 @@ def show_gmail_page():
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Tool descriptions
-    tool_info = {
-        "check_gmail_privacy": "Scans Gmail for PII exposure, risky headers, and suspicious senders",
-        "get_privacy_summary": "Comprehensive audit of both Gmail and Google Drive",
-        "check_drive_privacy": "Analyzes Drive files for permission issues and public sharing"
-    }
-    st.info(f"ℹ️ {tool_info.get(tool, '')}")
+    st.info(f"ℹ️ {GMAIL_TOOL_INFO.get(tool, '')}")
     
+    # Run, progress and results live in a fragment: clicking START AUDIT (or a
+    # download button) reruns only that panel, not the CSS, sidebar and module check
+    gmail_audit_panel(tool)
+
+@st.fragment
+def gmail_audit_panel(tool: str):
     # Run button
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
         run_btn = st.button("▶️ START AUDIT", use_container_width=True, type="primary", disabled=not can_run)
     
+    # Warm the MCP server while the user is still choosing options
+    if can_run:
+        get_runner(server_path).warm_up()
+    
     # Progress section
     st.markdown("---")
     progress_bar = st.progress(0, text="⏸️ Idle")
     status_text = st.empty()
     
     with st.expander("📊 Live Server Logs", expanded=False):
+        if not stream_logs:
+            st.caption("Live streaming is off — logs appear here when the run ends.")
         live_log = st.empty()
     
-    def progress_cb(kind: str, cur: Optional[int], tot: Optional[int], raw_line: str):
-        if raw_line:
-            lines = (st.session_state.logbuf + raw_line + "\n").splitlines()[-200:]
-            st.session_state.logbuf = "\n".join(lines)
-            live_log.code(st.session_state.logbuf, language="text")
-        if kind in ("message", "file") and isinstance(cur, int) and isinstance(tot, int) and tot > 0:
-            pct = int(cur / tot * 100)
-            progress_bar.progress(pct, text=f"⚡ {kind.title()}: {cur}/{tot} ({pct}%)")
-            status_text.markdown(f"**Processing**: `{cur}/{tot}` {kind}s")
+    run_progress = RunProgress(progress_bar, status_text, live_log)
     
     # Execute audit
+    if run_btn:
+        runner: MCPRunner = get_runner(server_path)
+        if not acquire_runner(runner, status_text):
+            run_btn = False
     if run_btn:
         st.session_state.payload = None
-        st.session_state.logbuf = ""
+        st.session_state.logbuf.clear()
         st.session_state.last_error = None
         progress_bar.progress(0, text="🚀 Initializing...")
         status_text.write("🔄 Starting MCP server...")
         
-        need_new_runner = (not st.session_state.runner) or (st.session_state.runner.server_path != server_path)
-        if need_new_runner and st.session_state.runner:
-            st.session_state.runner.stop()
-            st.session_state.runner = None
-        if not st.session_state.runner:
-            st.session_state.runner = MCPRunner(server_path, rpc_timeout=float(timeout))
-        
-        runner: MCPRunner = st.session_state.runner
+        st.session_state.runner = runner
         
         try:
             runner.rpc_timeout = float(timeout)
-            runner.start()
+            runner.log_verbosity = "all" if stream_logs else "progress"
+            if not runner.is_running():
+                runner.start()
             status_text.write("🔐 Authenticating (check browser for OAuth)...")
-            runner.ensure_initialized(progress_cb=progress_cb)
+            runner.ensure_initialized(progress_cb=run_progress.progress_cb)
             
             with st.spinner("⚙️ Running audit..."):
-                result = runner.call_tool(tool, {}, progress_cb=progress_cb)
+                result = runner.call_tool(tool, {}, progress_cb=run_progress.progress_cb)
             
             # Parse result
             content = result.get("content", [])
             if content and isinstance(content, list) and content[0].get("type") == "text":
                 txt = content[0].get("text", "")
                 try:
-                    payload = json.loads(txt)
+                    payload = _loads(txt)
                 except Exception:
                     payload = txt
             else:
@@ -1055,6 +1561,12 @@ def show_gmail_page():
             st.session_state.last_error = f"Error: {e}"
             status_text.error(st.session_state.last_error)
             progress_bar.progress(0, text="❌ Error")
+        finally:
+            if not stream_logs:
+                # Nothing was painted per line; show the server's recent output once
+                run_progress.append_log(runner.drain_logs())
+            runner.lock.release()
+            run_progress.flush_log()
     
     # Display results
     payload = st.session_state.payload
@@ -1068,14 +1580,14 @@ def show_gmail_page():
         with tabs[0]:
             st.markdown("#### 📄 METADATA PAYLOAD")
             st.caption("Raw JSON data collected during the audit")
-            st.json(payload)
+            show_payload_json(payload, key="gmail_full_json")
         
         with tabs[1]:
             st.markdown("#### 🤖 AI-POWERED ANALYSIS")
             
             if not use_ai:
                 st.info("ℹ️ AI analysis is disabled. Enable it in the sidebar.")
-            elif not OpenAI:
+            elif _get_openai() is None:
                 st.warning("⚠️ OpenAI package not installed")
             else:
                 pplx_key = PPLX_API_KEY
@@ -1083,84 +1595,104 @@ def show_gmail_page():
                     st.warning("🔑 Perplexity API key not found")
                 else:
                     try:
-                        client = OpenAI(api_key=pplx_key, base_url="https://api.perplexity.ai")
-                        model_name = "sonar"
+                        client = get_pplx_client(pplx_key)
                         
                         gmail_meta = payload.get("gmail")
                         drive_meta = payload.get("drive")
+                        memo = ai_memo("gmail", payload)
                         
-                        def ai_analyze(title: str, data_obj: Any, instructions: str) -> str:
-                            data_txt = json.dumps(data_obj, indent=2)
-                            resp = client.chat.completions.create(
-                                model=model_name,
+                        def ai_analyze(title: str, data_obj: Any, instructions: str, project: Optional[Callable[[Any], Any]] = None, parts: Optional[List[str]] = None) -> str:
+                            # Project and dump on the worker, and only when the memo actually misses
+                            data_txt = _dumpb(project(data_obj) if project else data_obj).decode("utf-8")
+                            parts = [] if parts is None else parts
+                            stream = client.chat.completions.create(
+                                model=PPLX_MODEL,
                                 messages=[
                                     {"role": "system", "content": instructions},
                                     {"role": "user", "content": data_txt},
                                 ],
                                 max_tokens=900,
                                 temperature=0.3,
+                                stream=True,
                             )
-                            return resp.choices[0].message.content
+                            for chunk in stream:
+                                if chunk.choices and chunk.choices[0].delta.content:
+                                    parts.append(chunk.choices[0].delta.content)
+                            return "".join(parts)
                         
                         if gmail_meta is None and drive_meta is None:
                             st.info("ℹ️ No data to analyze")
                         elif gmail_meta and drive_meta:
-                            with st.spinner("🔍 Analyzing Gmail..."):
-                                gmail_summary = ai_analyze(
+                            # Gmail and Drive analyses are independent: stream both requests concurrently
+                            st.markdown("##### 📧 Gmail Analysis")
+                            gmail_box = st.empty()
+                            st.markdown("##### 📁 Drive Analysis")
+                            drive_box = st.empty()
+                            gmail_summary, drive_summary = stream_ai_results([
+                                (
+                                    gmail_box,
+                                    "gmail",
+                                    ai_analyze,
                                     "Gmail",
                                     gmail_meta,
                                     "You are a privacy compliance assistant. Analyze this Gmail metadata and flag potential privacy risks (PII exposure, risky headers, senders, patterns). Provide prioritized, actionable steps.",
-                                )
-                            st.markdown("##### 📧 Gmail Analysis")
-                            st.success(gmail_summary)
-                            
-                            with st.spinner("🔍 Analyzing Drive..."):
-                                drive_summary = ai_analyze(
+                                    project_gmail_for_ai,
+                                ),
+                                (
+                                    drive_box,
+                                    "drive",
+                                    ai_analyze,
                                     "Drive",
                                     drive_meta,
                                     "You are a privacy compliance assistant. Analyze this Drive metadata (filenames, permissions, link-sharing) and flag privacy risks (public links, oversharing, sensitive filenames). Provide prioritized steps.",
-                                )
-                            st.markdown("##### 📁 Drive Analysis")
-                            st.success(drive_summary)
+                                    project_drive_for_ai,
+                                ),
+                            ], memo=memo)
                             
-                            with st.spinner("🔍 Generating summary..."):
-                                combined_prompt = {"gmail_analysis": gmail_summary, "drive_analysis": drive_summary}
-                                overall = ai_analyze(
-                                    "Overall",
-                                    combined_prompt,
-                                    "You are a privacy lead. Read the Gmail and Drive analyses. Produce a concise overall risk summary with (1) top 3 risks (2) severity (low/med/high) (3) immediate actions (24–48h) (4) follow-ups, (5) known unknowns.",
-                                )
                             st.markdown("##### 📊 Overall Summary")
-                            st.success(overall)
+                            combined_prompt = {"gmail_analysis": gmail_summary, "drive_analysis": drive_summary}
+                            stream_ai_results([(
+                                st.empty(),
+                                "overall",
+                                ai_analyze,
+                                "Overall",
+                                combined_prompt,
+                                "You are a privacy lead. Read the Gmail and Drive analyses. Produce a concise overall risk summary with (1) top 3 risks (2) severity (low/med/high) (3) immediate actions (24–48h) (4) follow-ups, (5) known unknowns.",
+                            )], memo=memo)
                         
                         elif gmail_meta:
-                            with st.spinner("🔍 Analyzing..."):
-                                out = ai_analyze(
-                                    "Gmail",
-                                    gmail_meta,
-                                    "You are a privacy compliance assistant. Analyze this Gmail metadata and flag privacy risks. Provide prioritized, actionable steps.",
-                                )
-                            st.success(out)
+                            stream_ai_results([(
+                                st.empty(),
+                                "gmail",
+                                ai_analyze,
+                                "Gmail",
+                                gmail_meta,
+                                "You are a privacy compliance assistant. Analyze this Gmail metadata and flag privacy risks. Provide prioritized, actionable steps.",
+                                project_gmail_for_ai,
+                            )], memo=memo)
                         
                         elif drive_meta:
-                            with st.spinner("🔍 Analyzing..."):
-                                out = ai_analyze(
-                                    "Drive",
-                                    drive_meta,
-                                    "You are a privacy compliance assistant. Analyze this Drive metadata and flag privacy risks. Provide prioritized, actionable steps.",
-                                )
-                            st.success(out)
+                            stream_ai_results([(
+                                st.empty(),
+                                "drive",
+                                ai_analyze,
+                                "Drive",
+                                drive_meta,
+                                "You are a privacy compliance assistant. Analyze this Drive metadata and flag privacy risks. Provide prioritized, actionable steps.",
+                                project_drive_for_ai,
+                            )], memo=memo)
                     
                     except Exception as e:
                         st.error(f"❌ API Error: {e}")
         
         with tabs[2]:
             st.markdown("#### 💾 EXPORT OPTIONS")
+            blob = payload_json(payload)
             col1, col2 = st.columns(2)
             with col1:
                 st.download_button(
                     label="📥 Download JSON",
-                    data=json.dumps(payload, indent=2),
+                    data=blob,
                     file_name="gmail_drive_audit.json",
                     mime="application/json",
                     use_container_width=True
@@ -1168,7 +1700,7 @@ def show_gmail_page():
             with col2:
                 st.download_button(
                     label="📥 Download Report",
-                    data=json.dumps(payload, indent=2),
+                    data=lambda p=payload: build_gmail_drive_report(p),
                     file_name="audit_report.txt",
                     mime="text/plain",
                     use_container_width=True
@@ -1179,6 +1711,19 @@ def show_gmail_page():
 # ---------------------------------------------------------------------
 # WEBSITE AUDIT PAGE
 # ---------------------------------------------------------------------
+@st.fragment(run_every=1)
+def poll_bridge():
+    """Once-a-second bridge check that reruns only this fragment until a new URL lands.
+
+    Detection itself is event-driven (QueueWatcher), so each tick is just a locked
+    read of the latest event; that is cheap enough to tick faster than the old 3 s loop.
+    """
+    ev = get_queue_watcher(QUEUE_FILE).latest()
+    if ev and isinstance(ev, dict) and ev.get("type") == "website_url":
+        if float(ev.get("ts", 0) or 0) > float(st.session_state.last_bridge_ts or 0):
+            # Full-app rerun so the page below picks the event up and auto-starts the scan
+            st.rerun()
+
 def show_website_page():
     # Back button
     if st.button("← Back to Home", type="secondary"):
@@ -1194,7 +1739,7 @@ def show_website_page():
     incoming_url = None
 
     if listen_bridge:
-        ev = read_last_queue_event()
+        ev = get_queue_watcher(QUEUE_FILE).latest()
         if ev and isinstance(ev, dict) and ev.get("type") == "website_url":
             ts = float(ev.get("ts", 0) or 0)
             if ts > float(st.session_state.last_bridge_ts or 0):
@@ -1217,12 +1762,10 @@ def show_website_page():
     st.markdown('<div class="config-panel">', unsafe_allow_html=True)
     st.markdown("### 🎯 TARGET CONFIGURATION")
 
-    col1, col2 = st.columns([3, 1])
-    with col2:
-        if st.session_state.runner and st.session_state.runner.initialized:
-            st.markdown('<div class="status-indicator status-active">🟢 READY</div>', unsafe_allow_html=True)
-        else:
-            st.markdown('<div class="status-indicator status-idle">⚪ IDLE</div>', unsafe_allow_html=True)
+    if st.session_state.runner and st.session_state.runner.initialized:
+        st.markdown('<div class="status-indicator status-active">🟢 READY</div>', unsafe_allow_html=True)
+    else:
+        st.markdown('<div class="status-indicator status-idle">⚪ IDLE</div>', unsafe_allow_html=True)
 
     # URL input - use incoming URL if available, otherwise default
     default_url = incoming_url if incoming_url else "https://example.com"
@@ -1253,18 +1796,26 @@ def show_website_page():
 
     st.markdown('</div>', unsafe_allow_html=True)
 
-    mode_info = {
-        "generic": "General website scan for cookies, trackers, and privacy policies",
-        "login": "Focused analysis on login forms and authentication security",
-        "signup": "Registration form analysis for PII collection and data minimization"
-    }
-    st.info(f"ℹ️ {mode_info.get(mode, '')}")
+    st.info(f"ℹ️ {WEBSITE_MODE_INFO.get(mode, '')}")
+
+    # Run, progress and results live in a fragment, as on the Gmail page
+    website_scan_panel(url, mode, max_wait_ms)
 
+    # Keep watching the bridge without re-running the whole script
+    if listen_bridge:
+        poll_bridge()
+
+@st.fragment
+def website_scan_panel(url: str, mode: str, max_wait_ms: int):
     # Run button (manual)
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
         manual_run_btn = st.button("▶️ START SCAN", use_container_width=True, type="primary", disabled=not can_run)
 
+    # Warm the MCP server while the user is still choosing options
+    if can_run:
+        get_runner(server_path).warm_up()
+
     # Auto-run if URL came from bridge
     run_btn = manual_run_btn or st.session_state.auto_from_bridge
     
@@ -1278,51 +1829,44 @@ def show_website_page():
     status_text = st.empty()
 
     with st.expander("📊 Live Server Logs", expanded=False):
+        if not stream_logs:
+            st.caption("Live streaming is off — logs appear here when the run ends.")
         live_log = st.empty()
 
-    def progress_cb(kind: str, cur: Optional[int], tot: Optional[int], raw_line: str):
-        if raw_line:
-            lines = (st.session_state.logbuf + raw_line + "\n").splitlines()[-200:]
-            st.session_state.logbuf = "\n".join(lines)
-            live_log.code(st.session_state.logbuf, language="text")
-        if kind in ("message", "file") and isinstance(cur, int) and isinstance(tot, int) and tot > 0:
-            pct = int(cur / tot * 100)
-            progress_bar.progress(pct, text=f"⚡ {kind.title()}: {cur}/{tot} ({pct}%)")
-            status_text.markdown(f"**Processing**: `{cur}/{tot}` {kind}s")
+    run_progress = RunProgress(progress_bar, status_text, live_log)
 
     # Execute scan
+    if run_btn:
+        runner: MCPRunner = get_runner(server_path)
+        if not acquire_runner(runner, status_text):
+            run_btn = False
     if run_btn:
         st.session_state.web_payload = None
-        st.session_state.logbuf = ""
+        st.session_state.logbuf.clear()
         st.session_state.last_error = None
         progress_bar.progress(0, text="🚀 Initializing...")
         status_text.write("🔄 Starting MCP server...")
 
-        need_new_runner = (not st.session_state.runner) or (st.session_state.runner.server_path != server_path)
-        if need_new_runner and st.session_state.runner:
-            st.session_state.runner.stop()
-            st.session_state.runner = None
-        if not st.session_state.runner:
-            st.session_state.runner = MCPRunner(server_path, rpc_timeout=float(timeout))
-
-        runner: MCPRunner = st.session_state.runner
+        st.session_state.runner = runner
 
         try:
             runner.rpc_timeout = float(timeout)
-            runner.start()
+            runner.log_verbosity = "all" if stream_logs else "progress"
+            if not runner.is_running():
+                runner.start()
             status_text.write("🔐 Initializing scan...")
-            runner.ensure_initialized(progress_cb=progress_cb)
+            runner.ensure_initialized(progress_cb=run_progress.progress_cb)
 
             args = {"url": url, "mode": mode, "max_wait_ms": int(max_wait_ms)}
             with st.spinner("🔍 Scanning website..."):
-                result = runner.call_tool("check_website_privacy", args, progress_cb=progress_cb)
+                result = runner.call_tool("check_website_privacy", args, progress_cb=run_progress.progress_cb)
 
             # Parse result
             content = result.get("content", [])
             if content and isinstance(content, list) and content[0].get("type") == "text":
                 txt = content[0].get("text", "")
                 try:
-                    web_payload = json.loads(txt)
+                    web_payload = _loads(txt)
                 except Exception:
                     web_payload = txt
             else:
@@ -1340,6 +1884,12 @@ def show_website_page():
             st.session_state.last_error = f"Error: {e}"
             status_text.error(st.session_state.last_error)
             progress_bar.progress(0, text="❌ Error")
+        finally:
+            if not stream_logs:
+                # Nothing was painted per line; show the server's recent output once
+                run_progress.append_log(runner.drain_logs())
+            runner.lock.release()
+            run_progress.flush_log()
 
     # Display results
     web_payload = st.session_state.web_payload
@@ -1353,13 +1903,13 @@ def show_website_page():
         with tabs[0]:
             st.markdown("#### 📄 WEBSITE AUDIT DATA")
             st.caption("Complete scan data from target website")
-            st.json(web_payload)
+            show_payload_json(web_payload, key="website_full_json")
 
         with tabs[1]:
             st.markdown("#### 🤖 AI-POWERED ANALYSIS")
             if not use_ai:
                 st.info("ℹ️ AI analysis is disabled. Enable it in the sidebar.")
-            elif not OpenAI:
+            elif _get_openai() is None:
                 st.warning("⚠️ OpenAI package not installed")
             else:
                 pplx_key = PPLX_API_KEY
@@ -1367,42 +1917,38 @@ def show_website_page():
                     st.warning("🔑 Perplexity API key not found")
                 else:
                     try:
-                        client = OpenAI(api_key=pplx_key, base_url="https://api.perplexity.ai")
-                        model_name = "sonar"
-                        system_prompt = (
-                            "You are a privacy/compliance auditor. Simplify the content so everyone understands it, "
-                            "even people who aren't well-versed with security and privacy schemes. "
-                            "Read the website audit JSON (dynamic or static) and produce a clear summary with:\n"
-                            "1) Consent & Cookies — were third-party/ads cookies set pre-consent? Summarize consent/cookies and diffs.\n"
-                            "2) Trackers/Third Parties — list notable thirdParty domains.\n"
-                            "3) Forms & PII — summarize forms, PII types requested, and minimization concerns by mode (login/signup).\n"
-                            "4) Security Headers — note HSTS/CSP/XFO presence and obvious misconfigurations.\n"
-                            "5) Policies — whether canonical privacy/terms were fetched; highlight missing rights/retention/transfer mentions.\n"
-                            "6) Final Verdict — severity (low/medium/high) with prioritized actions.\n"
-                            "Be concise, factual, and action-oriented. If evidence is weak or inconclusive, say so."
-                        )
-                        data_txt = json.dumps(web_payload, indent=2)
-                        with st.spinner("🔍 Analyzing scan data..."):
-                            resp = client.chat.completions.create(
-                                model=model_name,
+                        client = get_pplx_client(pplx_key)
+
+                        def analyze_site(parts: List[str]) -> str:
+                            # Project and dump on the worker, and only when the memo actually misses
+                            data_txt = _dumpb(project_website_for_ai(web_payload)).decode("utf-8")
+                            stream = client.chat.completions.create(
+                                model=PPLX_MODEL,
                                 messages=[
-                                    {"role": "system", "content": system_prompt},
+                                    {"role": "system", "content": WEBSITE_SYSTEM_PROMPT},
                                     {"role": "user", "content": data_txt},
                                 ],
                                 max_tokens=1000,
                                 temperature=0.3,
+                                stream=True,
                             )
-                        st.success(resp.choices[0].message.content)
+                            for chunk in stream:
+                                if chunk.choices and chunk.choices[0].delta.content:
+                                    parts.append(chunk.choices[0].delta.content)
+                            return "".join(parts)
+
+                        stream_ai_results([(st.empty(), "website", analyze_site)], memo=ai_memo("website", web_payload))
                     except Exception as e:
                         st.error(f"❌ API Error: {e}")
 
         with tabs[2]:
             st.markdown("#### 💾 EXPORT OPTIONS")
+            blob = payload_json(web_payload)
             col1, col2 = st.columns(2)
             with col1:
                 st.download_button(
                     label="📥 Download JSON",
-                    data=json.dumps(web_payload, indent=2),
+                    data=blob,
                     file_name="website_audit.json",
                     mime="application/json",
                     use_container_width=True
@@ -1410,7 +1956,7 @@ def show_website_page():
             with col2:
                 st.download_button(
                     label="📥 Download Report",
-                    data=json.dumps(web_payload, indent=2),
+                    data=lambda p=web_payload: build_website_report(p),
                     file_name="website_report.txt",
                     mime="text/plain",
                     use_container_width=True
@@ -1418,13 +1964,6 @@ def show_website_page():
 
         st.markdown('</div>', unsafe_allow_html=True)
 
-    # Auto-refresh when listening (check every 3 seconds)
-    if listen_bridge:
-        st_autorefresh = st.empty()
-        with st_autorefresh:
-            time.sleep(3)
-            st.rerun()
-
 # ---------------------------------------------------------------------
 # PAGE ROUTER
 # ---------------------------------------------------------------------
@@ -16,17 +16,20 @@ except ImportError:
 app = Flask(__name__)
 CORS(app)
 
+def _secret(name):
+    # st.secrets raises if no secrets.toml exists; treat that as "not set"
+    try:
+        return secrets.get(name)
+    except Exception:
+        return None
+
+# Queue file path - resolved the same way as in app.py (env, secrets, default)
 QUEUE_PATH = (
     os.getenv("QUEUE_FILE")
-    or secrets.get("QUEUE_FILE")
+    or _secret("QUEUE_FILE")
     or os.path.join(os.getcwd(), "bridge_queue.jsonl")
 )
 
-# Queue file path - can be overridden by environment variable
-QUEUE_PATH = os.getenv("QUEUE_FILE") or os.path.join(os.getcwd(), "bridge_queue.jsonl")
-
-QUEUE_FILE = os.path.abspath(os.path.join(os.getcwd(), "bridge_queue.jsonl"))
-
 @app.route("/", methods=["GET"])
 def home():
     return jsonify({
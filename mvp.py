@@ -705,6 +705,10 @@ def test_auth_on_startup():
         print(f"Authentication failed: {e}", file=sys.stderr)
         return False
 
+def _tool_result(payload):
+    """Tool payload as a single compact JSON text block (indentation only adds bytes to the pipe)."""
+    return [types.TextContent(type="text", text=json.dumps(payload, separators=(",", ":")))]
+
 # Create server instance
 app = Server("privacy-checker")
 
@@ -765,11 +769,11 @@ async def handle_call_tool(name: str, arguments: dict) -> list[types.TextContent
     
     if name == "check_gmail_privacy":
         result = await check_gmail_privacy()
-        return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+        return _tool_result(result)
     
     elif name == "check_drive_privacy":
         result = await check_drive_privacy()
-        return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+        return _tool_result(result)
     
     elif name == "get_privacy_summary":
         """
@@ -788,11 +792,11 @@ async def handle_call_tool(name: str, arguments: dict) -> list[types.TextContent
                 "drive_raw": drive_raw,
                 "note": "Client is expected to run AI analysis over gmail_raw and drive_raw.",
             }
-            return [types.TextContent(type="text", text=json.dumps(payload, indent=2))]
+            return _tool_result(payload)
         except Exception as e:
             logger.error(f"get_privacy_summary failed: {e}")
             payload = {"success": False, "error": str(e), "ts": datetime.now().isoformat()}
-            return [types.TextContent(type="text", text=json.dumps(payload, indent=2))]
+            return _tool_result(payload)
     elif name == "check_website_privacy":
         try:
             arguments = arguments or {}
@@ -803,11 +807,11 @@ async def handle_call_tool(name: str, arguments: dict) -> list[types.TextContent
             max_wait_ms = int(arguments.get("max_wait_ms", 15000))
 
             result = await check_website_privacy(url, mode=mode, max_wait_ms=max_wait_ms)
-            return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+            return _tool_result(result)
         except Exception as e:
             logger.error(f"check_website_privacy failed: {e}")
             payload = {"success": False, "error": str(e), "ts": datetime.now().isoformat()}
-            return [types.TextContent(type="text", text=json.dumps(payload, indent=2))]        
+            return _tool_result(payload)        
                  
     else:
         raise ValueError(f"Unknown tool: {name}")